@@ -1,15 +1,197 @@
+import glob
+import hashlib
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from tsdownsample import MinMaxLTTBDownsampler
 
 # --- Page Config ---
 st.set_page_config(page_title="Weather Insights Dashboard", layout="wide")
 
 # --- Load Data ---
-df = pd.read_csv("weatherAUS_rainfall_prediction_dataset_cleaned.csv")
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-df["Year"] = df["Date"].dt.year
-df["Month"] = df["Date"].dt.month
+# Only the columns the dashboard uses; float32 halves the numeric columns
+# and integer-coded categoricals keep isin/groupby off the Python string path
+USECOLS = ["Date", "Location", "MaxTemp", "Rainfall", "Humidity3pm", "RainToday", "RainTomorrow"]
+DTYPES = {
+    "MaxTemp": "float32",
+    "Rainfall": "float32",
+    "Humidity3pm": "float32",
+    "Location": "category",
+    "RainToday": pd.CategoricalDtype(["Yes", "No"]),
+    "RainTomorrow": pd.CategoricalDtype(["Yes", "No"]),
+}
+
+# Simple month mapping for Australian seasons: the season code of each
+# month, indexed 1-12
+SEASONS = ["Summer", "Autumn", "Winter", "Spring"]
+MONTH_SEASON_CODES = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype="int8")
+
+def read_typed_csv(csv_path):
+    # Parse the CSV text once with the multithreaded Arrow reader
+    df = pd.read_csv(csv_path, usecols=USECOLS, dtype=DTYPES, engine="pyarrow")
+    # Arrow parses clean ISO dates itself; the explicit format keeps any
+    # leftover strings on the vectorised path instead of per-row inference
+    df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce")
+    return df
+
+def write_parquet(df, parquet_path):
+    # Unique temp file in the same directory, so concurrent writers never
+    # share a path and the final os.replace stays atomic
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(parquet_path)), suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        df.to_parquet(tmp_path, compression="zstd", index=False)
+        os.replace(tmp_path, parquet_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def dtype_label(dtype):
+    # Plain strings only: repr() of dtype objects varies across pandas versions
+    if isinstance(dtype, pd.CategoricalDtype) and dtype.categories is not None:
+        return "category[" + ",".join(map(str, dtype.categories)) + "]"
+    return str(dtype)
+
+# The Parquet copy's name carries a hash of the schema it was written with,
+# so changing USECOLS or DTYPES builds a fresh copy instead of reading a
+# stale one
+SCHEMA = ";".join(f"{col}:{dtype_label(DTYPES.get(col, 'infer'))}" for col in USECOLS)
+SCHEMA_TAG = hashlib.sha1(SCHEMA.encode()).hexdigest()[:8]
+
+# csv_mtime is only part of the cache key, so an updated CSV is reloaded
+# within a running process
+@st.cache_data
+def load_data(csv_path, csv_mtime):
+    parquet_path = f"{csv_path}.{SCHEMA_TAG}.parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= csv_mtime:
+        df = pd.read_parquet(parquet_path, columns=USECOLS)
+    else:
+        df = read_typed_csv(csv_path)
+        try:
+            write_parquet(df, parquet_path)
+        except OSError:
+            # Read-only or full disk: serve this process from the CSV frame
+            pass
+        else:
+            # Copies written under an older schema are never read again
+            for stale in glob.glob(f"{glob.escape(csv_path)}.*.parquet"):
+                if stale != parquet_path:
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+    df = df.dropna(subset=["Date"]).sort_values("Date", ignore_index=True)
+    df["Year"] = df["Date"].dt.year.astype("int16")
+    months = df["Date"].dt.month.to_numpy()
+    df["Season"] = pd.Categorical.from_codes(MONTH_SEASON_CODES[months], categories=SEASONS)
+    # 0/1 flag so rain probability is a plain Cython groupby mean
+    df["RainTomorrowYes"] = (df["RainTomorrow"] == "Yes").astype("int8")
+    # Static humidity bins as a categorical of interval labels (int8 codes)
+    df["HumidityLevel"] = pd.cut(df["Humidity3pm"], bins=5).cat.rename_categories(str)
+    # RainTomorrow only feeds the flag above; the cached frame is copied out
+    # on every rerun, so don't carry it
+    return df.drop(columns=["RainTomorrow"])
+
+CSV_PATH = "weatherAUS_rainfall_prediction_dataset_cleaned.csv"
+csv_mtime = os.path.getmtime(CSV_PATH)
+df = load_data(CSV_PATH, csv_mtime)
+
+# Trend lines are downsampled once per filter selection with MinMaxLTTB,
+# which keeps each city's line shape with at most this many points per
+# trace. Zooming in shows the same points; it does not re-fetch finer detail.
+TREND_POINTS_PER_LINE = 500
+TREND_DOWNSAMPLER = MinMaxLTTBDownsampler()
+
+# Trend panels, top to bottom
+TREND_METRICS = [
+    ("MaxTemp", "🌡️ Temperature Over Time"),
+    ("Rainfall", "🌧️ Rainfall Over Time"),
+    ("Humidity3pm", "💧 Humidity Over Time"),
+]
+
+# Shared figure layout, built once rather than per rerun
+MAP_LAYOUT = dict(height=550, margin=dict(l=0, r=0, t=0, b=0))
+
+# Display name and coordinates for 10 major cities, keyed by dataset
+# Location name
+CITY_COORDS = {
+    "Sydney": ("Sydney", -33.8688, 151.2093),
+    "Melbourne": ("Melbourne", -37.8136, 144.9631),
+    "Brisbane": ("Brisbane", -27.4698, 153.0251),
+    "Perth": ("Perth", -31.9505, 115.8605),
+    "Adelaide": ("Adelaide", -34.9285, 138.6007),
+    "Hobart": ("Hobart", -42.8821, 147.3272),
+    "Darwin": ("Darwin", -12.4634, 130.8456),
+    "Canberra": ("Canberra", -35.2809, 149.1300),
+    "GoldCoast": ("Gold Coast", -28.0167, 153.4000),
+    "Cairns": ("Cairns", -16.9186, 145.7781),
+}
+
+# Static lookup shared across reruns and sessions; treat it as read-only
+@st.cache_resource
+def get_city_coords():
+    return pd.DataFrame.from_dict(CITY_COORDS, orient="index", columns=["City", "Lat", "Lon"])
+
+# --- Cached Aggregations ---
+# Every KPI and chart aggregate comes from one cached call keyed on the
+# data version and filter selections; the leading underscore tells Streamlit not to hash
+# the filtered frame itself. Bounded so long sessions don't grow memory.
+@st.cache_data(max_entries=64)
+def compute_aggregates(filter_key, _filtered_df):
+    kpis = {
+        "avg_temp": float(_filtered_df["MaxTemp"].mean()),
+        "avg_humidity": float(_filtered_df["Humidity3pm"].mean()),
+        "total_rainfall": float(_filtered_df["Rainfall"].sum()),
+        "rainy_days": int((_filtered_df["RainToday"] == "Yes").sum()),
+    }
+    # One pass over the rows for every per-location mean
+    by_location = (
+        _filtered_df.groupby("Location", observed=True, sort=False)
+        [["Rainfall", "MaxTemp", "Humidity3pm"]].mean()
+    )
+    top5 = by_location["Rainfall"].nlargest(5)
+    annual = _filtered_df.groupby("Year")["Rainfall"].mean()
+    rain_prob = (
+        _filtered_df.groupby("HumidityLevel", observed=True)["RainTomorrowYes"]
+        .mean().mul(100)
+    )
+    # Per-city averages; the inner hash join on the coordinate table keeps
+    # only the mapped cities
+    cities = (
+        by_location[["MaxTemp", "Humidity3pm"]]
+        .rename(columns={"MaxTemp": "Temp", "Humidity3pm": "Humidity"})
+        .merge(get_city_coords(), left_index=True, right_index=True, how="inner")
+        .reset_index(drop=True)
+    )
+    # Downsampled (x, y) per trend panel for each city; rows are already in
+    # date order, as the downsampler needs
+    trends = []
+    for city, city_df in _filtered_df.groupby("Location", observed=True):
+        # Epoch milliseconds as float64: Plotly sends float arrays as base64 typed
+        # arrays (int64 would go out as a JSON list of 13-digit numbers) instead
+        # of one ISO string per point; the date axis type renders them
+        dates = city_df["Date"].to_numpy().astype("datetime64[ms]").astype("int64").astype("float64")
+        lines = []
+        for col, _ in TREND_METRICS:
+            values = city_df[col].to_numpy()
+            idx = slice(None)
+            if len(values) > TREND_POINTS_PER_LINE:
+                idx = TREND_DOWNSAMPLER.downsample(dates, values, n_out=TREND_POINTS_PER_LINE)
+            lines.append((dates[idx], values[idx]))
+        trends.append((city, lines))
+    return {
+        "kpis": kpis, "top5": top5, "annual": annual, "rain_prob": rain_prob,
+        "cities": cities, "trends": trends,
+    }
+
 # --- Dashboard Title ---
 st.markdown("<h1 style='text-align: center;'>🌦️ WEATHER INSIGHTS DASHBOARD – AUSTRALIA</h1>", unsafe_allow_html=True)
 
@@ -24,7 +206,7 @@ with st.expander("🔍 Filters / Slicers", expanded=True):
     # First row (2 slicers)
     col1, col2 = st.columns(2)
     with col1:
-        locations = df["Location"].unique().tolist()   # dynamically extract cities
+        locations = df["Location"].cat.categories.tolist()   # dynamically extract cities
         location = st.multiselect("📍 Location", ["All"] + locations, default="All")
 
     with col2:
@@ -36,44 +218,50 @@ with st.expander("🔍 Filters / Slicers", expanded=True):
     # Second row (2 slicers)
     col3, col4 = st.columns(2)
     with col3:
-        season = st.selectbox("🍂 Season", ["All", "Summer", "Autumn", "Winter", "Spring"])
+        season = st.selectbox("🍂 Season", ["All"] + SEASONS)
 
     with col4:
         rain_today = st.selectbox("🌧 Rain Today?", ["All", "Yes", "No"])
 
 
 # --- Apply Filters ---
-filtered_df = df.copy()
+# df is sorted by Date, so the date range is a contiguous slice found by
+# binary search; the remaining filters build one boolean mask over it
+window = df
+if len(date_range) == 2:
+    dates = df["Date"].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(date_range[0]), side="left")
+    hi = np.searchsorted(dates, np.datetime64(date_range[1]), side="right")
+    window = df.iloc[lo:hi]
 
-if "All" not in locations:
-    filtered_df = filtered_df[filtered_df["Location"].isin(locations)]
+mask = np.ones(len(window), dtype=bool)
 
-if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["Date"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["Date"] <= pd.to_datetime(date_range[1]))
-    ]
+if "All" not in location:
+    mask &= window["Location"].isin(location).to_numpy()
 
 if rain_today != "All":
-    filtered_df = filtered_df[filtered_df["RainToday"] == rain_today]
+    mask &= (window["RainToday"] == rain_today).to_numpy()
 
 # (Optional) Apply season filter
 if season != "All":
-    # Simple mapping for Australia
-    month_to_season = {
-        12: "Summer", 1: "Summer", 2: "Summer",
-        3: "Autumn", 4: "Autumn", 5: "Autumn",
-        6: "Winter", 7: "Winter", 8: "Winter",
-        9: "Spring", 10: "Spring", 11: "Spring"
-    }
-    filtered_df["Season"] = filtered_df["Month"].map(month_to_season)
-    filtered_df = filtered_df[filtered_df["Season"] == season]
+    mask &= (window["Season"] == season).to_numpy()
+
+n_rows = int(mask.sum())
+if not n_rows:
+    st.warning("No data available for the selected filters.")
+    st.stop()
+
+filtered_df = window.loc[mask]
+# Small, order-independent cache key: the same selection in any order hits,
+# and any selection containing "All" shares one entry since it filters nothing.
+# The loader's schema tag and CSV mtime lead the key, so a reloaded CSV never
+# hits aggregates computed from the previous data.
+location_key = ("All",) if "All" in location else tuple(sorted(location))
+filter_key = (SCHEMA_TAG, csv_mtime, location_key, tuple(date_range), season, rain_today)
+aggregates = compute_aggregates(filter_key, filtered_df)
 
 # --- KPI Calculations ---
-avg_temp = filtered_df["MaxTemp"].mean()
-avg_humidity = filtered_df["Humidity3pm"].mean()
-total_rainfall = filtered_df["Rainfall"].sum()
-rainy_days = filtered_df[filtered_df["RainToday"] == "Yes"].shape[0]
+kpis = aggregates["kpis"]
 
 
 # --- KPI Cards ---
@@ -123,23 +311,23 @@ st.markdown(
 
 # --- KPI Cards Layout (all in one HTML block) ---
 st.markdown(
-    """
+    f"""
     <div class="kpi-container">
         <div class="kpi-card">
             <div class="kpi-title">🌡️ Average Temp (°C)</div>
-            <div class="kpi-value">23.2</div>
+            <div class="kpi-value">{kpis["avg_temp"]:.1f}</div>
         </div>
         <div class="kpi-card">
             <div class="kpi-title">💧 Average Humidity (%)</div>
-            <div class="kpi-value">52.0%</div>
+            <div class="kpi-value">{kpis["avg_humidity"]:.1f}%</div>
         </div>
         <div class="kpi-card">
             <div class="kpi-title">🌧️ Total Rainfall (mm)</div>
-            <div class="kpi-value">1315638.1</div>
+            <div class="kpi-value">{kpis["total_rainfall"]:.1f}</div>
         </div>
         <div class="kpi-card">
             <div class="kpi-title">☔ Rainy Days</div>
-            <div class="kpi-value">122162</div>
+            <div class="kpi-value">{kpis["rainy_days"]}</div>
         </div>
     </div>
     """,
@@ -148,28 +336,26 @@ st.markdown(
 
 # --- Row 1: Trend Charts ---
 st.markdown("## 📊 Weather Trends")
-tab1, tab2, tab3 = st.tabs(["🌡️ Temperature Trend", "🌧️ Rainfall Trend", "💧 Humidity Trend"])
-
-with tab1:
-    if not filtered_df.empty:
-        fig = px.line(filtered_df, x="Date", y="MaxTemp", color="Location", title="Temperature Over Time")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available for the selected filters.")
-
-with tab2:
-    if not filtered_df.empty:
-        fig = px.line(filtered_df, x="Date", y="Rainfall", color="Location", title="Rainfall Over Time")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available for the selected filters.")
 
-with tab3:
-    if not filtered_df.empty:
-        fig = px.line(filtered_df, x="Date", y="Humidity3pm", color="Location", title="Humidity Over Time")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available for the selected filters.")
+# One figure with a shared date axis instead of three separate charts
+fig = make_subplots(
+    rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+    subplot_titles=[title for _, title in TREND_METRICS]
+)
+colors = px.colors.qualitative.Plotly
+for i, (city, lines) in enumerate(aggregates["trends"]):
+    for row, (x, y) in enumerate(lines, start=1):
+        fig.add_trace(
+            go.Scattergl(
+                x=x, y=y,
+                name=city, mode="lines", legendgroup=city, showlegend=row == 1,
+                line=dict(color=colors[i % len(colors)])
+            ),
+            row=row, col=1
+        )
+fig.update_xaxes(type="date")
+fig.update_layout(height=900)
+st.plotly_chart(fig, use_container_width=True)
 
 # --- Row 2: Analysis Charts ---
 st.markdown("## 📈 Deeper Analysis")
@@ -177,97 +363,68 @@ tab4, tab5, tab6 = st.tabs(["🏆 Top 5 Rainiest Cities", "📅 Annual Rainfall
 
 # Chart 4: Top 5 Rainiest Cities
 with tab4:
-    if not filtered_df.empty:
-        top5 = (
-            filtered_df.groupby("Location")["Rainfall"].mean()
-            .sort_values(ascending=False)
-            .head(5)
-            .reset_index()
-        )
-        fig = px.bar(top5, x="Location", y="Rainfall", title="Top 5 Rainiest Cities", color="Rainfall")
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available.")
+    top5 = aggregates["top5"]
+    # Plotly Express takes the arrays directly, no reset_index DataFrame
+    fig = px.bar(
+        x=top5.index.astype(str),
+        y=top5.to_numpy(),
+        color=top5.to_numpy(),
+        labels={"x": "Location", "y": "Rainfall", "color": "Rainfall"},
+        title="Top 5 Rainiest Cities"
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
 # Chart 5: Annual Rainfall Trend
 with tab5:
-    if not filtered_df.empty:
-        annual = filtered_df.groupby("Year")["Rainfall"].mean().reset_index()
-        fig = px.line(annual, x="Year", y="Rainfall", title="Annual Rainfall Trend", markers=True)
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available.")
+    annual = aggregates["annual"]
+    fig = px.line(
+        x=annual.index.to_numpy(),
+        y=annual.to_numpy(),
+        labels={"x": "Year", "y": "Rainfall"},
+        title="Annual Rainfall Trend",
+        markers=True
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
 # Chart 6: Rain Probability by Humidity
 with tab6:
-    if not filtered_df.empty:
-        rain_prob = (
-            filtered_df.groupby(pd.cut(filtered_df["Humidity3pm"], bins=5))
-            ["RainTomorrow"].apply(lambda x: (x == "Yes").mean() * 100)
-            .reset_index()
-        )
-        rain_prob.columns = ["Humidity Level", "Rain Probability (%)"]
-
-        # Convert Interval to string for Plotly
-        rain_prob["Humidity Level"] = rain_prob["Humidity Level"].astype(str)
-
-        fig = px.bar(
-            rain_prob,
-            x="Humidity Level",
-            y="Rain Probability (%)",
-            title="Rain Probability by Humidity Level",
-            color="Rain Probability (%)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available.")
+    rain_prob = aggregates["rain_prob"]
+
+    fig = px.bar(
+        x=rain_prob.index.astype(str),
+        y=rain_prob.to_numpy(),
+        color=rain_prob.to_numpy(),
+        labels={"x": "Humidity Level", "y": "Rain Probability (%)", "color": "Rain Probability (%)"},
+        title="Rain Probability by Humidity Level"
+    )
+    st.plotly_chart(fig, use_container_width=True)
         
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
 import pandas as pd
 
-# 10 cities with coordinates + dummy weather data
-data = {
-    "City": [
-        "Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide",
-        "Hobart", "Darwin", "Canberra", "Gold Coast", "Cairns"
-    ],
-    "Lat": [
-        -33.8688, -37.8136, -27.4698, -31.9505, -34.9285,
-        -42.8821, -12.4634, -35.2809, -28.0167, -16.9186
-    ],
-    "Lon": [
-        151.2093, 144.9631, 153.0251, 115.8605, 138.6007,
-        147.3272, 130.8456, 149.1300, 153.4000, 145.7781
-    ],
-    "Temp": [24, 20, 27, 25, 22, 18, 30, 21, 26, 29],
-    "Humidity": [65, 55, 70, 60, 50, 68, 75, 52, 66, 80],
-}
-df = pd.DataFrame(data)
-
 # Weather Map Section
 st.subheader("🌍 Weather Map - Major Australian Cities")
 
-# Center the map based on average lat/lon
-m = folium.Map(
-    location=[df["Lat"].mean(), df["Lon"].mean()],
-    zoom_start=4,
-    tiles="CartoDB dark_matter"
-)
-
-# Add city markers
-for _, row in df.iterrows():
-    popup_text = f"""
-    <b>{row['City']}</b><br>
-    🌡 Temp: {row['Temp']} °C<br>
-    💧 Humidity: {row['Humidity']}%
-    """
-    folium.Marker(
-        location=[row["Lat"], row["Lon"]],
-        popup=popup_text,
-        icon=folium.Icon(color="blue", icon="cloud")
-    ).add_to(m)
-
-# Show map in Streamlit
-st_folium(m, width=950, height=550)
+city_coords = get_city_coords()
+cities_df = aggregates["cities"]
+
+if not cities_df.empty:
+    # One WebGL marker trace, centred on the average lat/lon
+    fig = px.scatter_map(
+        cities_df,
+        lat="Lat",
+        lon="Lon",
+        hover_name="City",
+        hover_data={"Temp": ":.1f", "Humidity": ":.1f", "Lat": False, "Lon": False},
+        labels={"Temp": "🌡 Temp (°C)", "Humidity": "💧 Humidity (%)"},
+        center={"lat": city_coords["Lat"].mean(), "lon": city_coords["Lon"].mean()},
+        zoom=3,
+        map_style="carto-darkmatter",
+    )
+    fig.update_traces(marker=dict(size=12, color="#1f77b4"))
+    fig.update_layout(**MAP_LAYOUT)
+
+    # Show map in Streamlit
+    st.plotly_chart(fig, use_container_width=True)
+else:
+    st.warning("No data available.")